@@ -10,8 +10,9 @@ import utils
 
 class Effects:
     ''' Create effect class '''
-    def __init__(self, strip, strip_settings, effects_settings):
+    def __init__(self, strip, strip_settings, effects_settings, governor=None):
         self.thread_stopped = False
+        self.governor = governor
         self.strip = strip
         self.strip_brightness = strip_settings['led_brightness']
         self.effects_settings = effects_settings
@@ -19,6 +20,8 @@ class Effects:
         self.effect_running = False
         self.effect_speed = ''
         self.effect_reverse = ''
+        self.effect = 'solid'
+        self.current_effect = 'solid'
 
         self.pixel_map = {
             'complete': [],
@@ -95,6 +98,24 @@ class Effects:
             speed = slow if self.effect_speed.lower() == 'slow' else fast
         return speed
 
+    def effect_interrupted(self):
+        ''' Check if running effect should stop (thread stopped or governor changed effect) '''
+        if self.thread_stopped:
+            return True
+        return bool(self.governor) and self.governor.effect(self.effect) != self.current_effect
+
+    def frame_sleep(self, delay, scale=True):
+        ''' Sleep between frames in short slices, return True if effect should stop '''
+        if scale and self.governor:
+            delay = self.governor.frame_delay(delay)
+        end = time.monotonic() + delay
+        while not self.effect_interrupted():
+            remaining = end - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, 0.1))
+        return True
+
     def run_effect(self, printer_state):
         ''' Run the effect specified '''
         self.printer_state = printer_state
@@ -104,9 +125,11 @@ class Effects:
         self.effect_speed = self.effects_settings[printer_state]['speed'] if 'speed' in self.effects_settings[printer_state] else 'fast'
         self.effect_reverse = self.effects_settings[printer_state]['reverse'] if 'reverse' in self.effects_settings[printer_state] else False
 
+        self.effect = effect
         while not self.thread_stopped:
             self.effect_running = True
-            eval(f"self.{effect}()")
+            self.current_effect = self.governor.effect(effect) if self.governor else effect
+            eval(f"self.{self.current_effect}()")
             self.effect_running = False
 
     def clear_strip(self):
@@ -119,7 +142,10 @@ class Effects:
         ''' Set static color for entire strip with no effect '''
         for pixel, color in enumerate(self.pixel_map[self.printer_state]):
             self.strip.setPixelColorRGB(pixel, *utils.color_brightness_correction(color, self.strip_brightness))
+        self.strip.setBrightness(self.strip_brightness)
         self.strip.show()
+        ## Nothing changes between frames, so don't redraw more than needed
+        self.frame_sleep(1, scale=False)
 
     def fade(self):
         ''' Fade entire strip with given color and speed '''
@@ -131,16 +157,19 @@ class Effects:
         for i in range(self.strip_brightness):
             self.strip.setBrightness(i)
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
 
-        time.sleep(speed * 5)
+        if self.frame_sleep(speed * 5):
+            return
 
         for i in range(self.strip_brightness, -1, -1):
             self.strip.setBrightness(i)
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
         
-        time.sleep(speed * 5)
+        self.frame_sleep(speed * 5)
 
     def chase(self):
         ''' Light one LED from one ond of the strip to the other, optionally reversed '''
@@ -159,7 +188,8 @@ class Effects:
                 else:
                     self.strip.setPixelColorRGB(pixel, 0, 0, 0)
                 self.strip.show()
-                time.sleep(speed)
+                if self.frame_sleep(speed):
+                    return
         if self.effect_reverse:
             self.clear_strip()
 
@@ -167,7 +197,8 @@ class Effects:
         ''' Bounce one LED back and forth '''
         self.chase()
         self.effect_reverse = not self.effect_reverse
-        self.chase()
+        if not self.effect_interrupted():
+            self.chase()
         self.effect_reverse = not self.effect_reverse
 
     def chase_ghost(self):
@@ -215,7 +246,8 @@ class Effects:
                 else:
                     self.strip.setPixelColorRGB(pixel, 0, 0, 0)
                 self.strip.show()
-                time.sleep(speed)
+                if self.frame_sleep(speed):
+                    return
         if self.effect_reverse:
             self.clear_strip()
 
@@ -223,7 +255,8 @@ class Effects:
         ''' Bounce one LED back and forth '''
         self.chase_ghost()
         self.effect_reverse = not self.effect_reverse
-        self.chase_ghost()
+        if not self.effect_interrupted():
+            self.chase_ghost()
         self.effect_reverse = not self.effect_reverse
 
     def fill(self, delay=True):
@@ -233,30 +266,35 @@ class Effects:
         for pixel in reversed(range(len(self.pixel_map[self.printer_state]))) if self.effect_reverse else range(len(self.pixel_map[self.printer_state])):
             self.strip.setPixelColorRGB(pixel, *self.pixel_map[self.printer_state][pixel])
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
         if delay:
-            time.sleep(speed * 5)
+            self.frame_sleep(speed * 5)
 
     def fill_unfill(self):
         ''' Fill strip one pixel at a time and clear in reverse '''
         speed = self.set_speed(0.1, 0.05)
         self.fill(delay=False)
-        time.sleep(speed * 2)
+        if self.frame_sleep(speed * 2):
+            return
         for pixel in reversed(range(len(self.pixel_map[self.printer_state]), -1, -1)) if self.effect_reverse else range(len(self.pixel_map[self.printer_state]), -1, -1):
             self.strip.setPixelColorRGB(pixel, 0, 0, 0)
             self.strip.show()
-            time.sleep(speed)
-        time.sleep(speed * 2)
+            if self.frame_sleep(speed):
+                return
+        self.frame_sleep(speed * 2)
 
     def fill_chase(self):
         ''' Fill strip one pixel at a time and clear in chase '''
         speed = self.set_speed(0.1, 0.05)
         self.fill(delay=False)
-        time.sleep(speed * 2)
+        if self.frame_sleep(speed * 2):
+            return
         for pixel in reversed(range(len(self.pixel_map[self.printer_state]))) if self.effect_reverse else range(len(self.pixel_map[self.printer_state])):
             self.strip.setPixelColorRGB(pixel, 0, 0, 0)
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
 
     def twinkle(self):
         ''' Flash single pixels, in specified color(s), at random '''
@@ -267,7 +305,8 @@ class Effects:
             pixel = randint(0, len(self.pixel_map[self.printer_state]) - 1)
             self.strip.setPixelColorRGB(pixel, *self.pixel_map[self.printer_state][pixel])
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
             self.clear_strip()
 
     def twinkle_colors(self):
@@ -282,7 +321,8 @@ class Effects:
             b = randint(0, 255)
             self.strip.setPixelColorRGB(i, r, g, b)
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
             self.clear_strip()
 
     def noise(self):
@@ -298,7 +338,8 @@ class Effects:
                 b = randint(0, 255) if rand_off else 0
                 self.strip.setPixelColorRGB(i, r, g, b)
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
 
     def wave(self):
         ''' Simulate waving flag '''
@@ -323,7 +364,8 @@ class Effects:
             if 0 <= i - 6 < len(self.pixel_map[self.printer_state]):
                 self.strip.setPixelColorRGB(i - 6, *utils.color_brightness_correction(self.pixel_map[self.printer_state][i - 6], 80))
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
 
     def slava_ukraini(self):
         ''' Simulate waving flag '''
@@ -350,7 +392,19 @@ class Effects:
             if 0 <= i - 6 < len(self.pixel_map[self.printer_state]):
                 self.strip.setPixelColorRGB(i - 6, *utils.color_brightness_correction(color1 if i - 6 < ((self.strip.numPixels() - 1) / 2) else color2, 80))
             self.strip.show()
-            time.sleep(speed)
+            if self.frame_sleep(speed):
+                return
+
+    def slava_ukraini_solid(self):
+        ''' Static flag colors, used when the governor limits slava_ukraini '''
+        self.strip.setBrightness(self.strip_brightness)
+        color1 = [0, 0, 255] if self.effect_reverse else [255, 255, 0]
+        color2 = [255, 255, 0] if self.effect_reverse else [0, 0, 255]
+        for pixel in range(len(self.pixel_map[self.printer_state])):
+            self.strip.setPixelColorRGB(pixel, *color1 if pixel < ((self.strip.numPixels() - 1) / 2) else color2)
+        self.strip.show()
+        ## Nothing changes between frames, so don't redraw more than needed
+        self.frame_sleep(1, scale=False)
 
 
 class Progress:
@@ -0,0 +1,200 @@
+# pylint: disable=C0301
+'''
+Host load governor to keep LED effects from starving Klipper of CPU time
+'''
+import json
+import os
+import time
+
+
+LEVELS = ['full', 'reduced', 'simple', 'static']
+
+## Effects that are swapped for a cheaper one from the 'simple' level up
+SIMPLE_EFFECTS = {
+    'chase_ghost': 'chase',
+    'ghost_bounce': 'bounce',
+    'twinkle_colors': 'twinkle',
+    'noise': 'twinkle',
+    'wave': 'solid',
+    'slava_ukraini': 'slava_ukraini_solid',
+}
+
+## Effects with their own colors that need a matching static frame instead of solid
+STATIC_EFFECTS = {
+    'slava_ukraini': 'slava_ukraini_solid',
+}
+
+## Shorter sample windows give meaningless CPU percentages (ex: first update right after start)
+MIN_SAMPLE_INTERVAL = 1.0
+
+DEFAULT_SETTINGS = {
+    'enabled': True,
+    'max_load': 0.75,
+    'max_cpu_percent': 70,
+    'max_process_cpu_percent': 15,
+    'restore_ratio': 0.6,
+    'restore_samples': 3,
+    'frame_slowdown': 2,
+    'metrics_file': None,
+}
+
+
+class LoadGovernor:
+    ''' Sample host load and step effect frame rate and complexity up or down '''
+    def __init__(self, governor_settings=None):
+        self.settings = dict(DEFAULT_SETTINGS)
+        if governor_settings:
+            self.settings.update(governor_settings)
+        self.enabled = self.settings['enabled'] and os.path.exists('/proc/stat')
+        self.level = 0
+        self.calm_samples = 0
+        self.level_changes = 0
+        self.last_change = None
+        self.last_reason = ''
+        self.load = 0.0
+        self.cpu_percent = 0.0
+        self.process_cpu_percent = 0.0
+        self.cpu_count = os.cpu_count() or 1
+        self.last_cpu_times = None
+        if self.enabled:
+            try:
+                self.last_cpu_times = self.read_cpu_times()
+            except (OSError, ValueError, IndexError) as err:
+                print(f'Governor: unable to read host load, disabling ({err})')
+                self.enabled = False
+        self.last_process_time = time.process_time()
+        self.last_sample_time = time.monotonic()
+
+    @staticmethod
+    def read_load():
+        ''' Get 1 minute load average from /proc/loadavg '''
+        with open('/proc/loadavg', 'r') as loadavg_file:
+            return float(loadavg_file.read().split()[0])
+
+    @staticmethod
+    def read_cpu_times():
+        ''' Get (busy, total) jiffies for all CPUs from /proc/stat '''
+        with open('/proc/stat', 'r') as stat_file:
+            fields = [int(x) for x in stat_file.readline().split()[1:]]
+        ## idle + iowait
+        idle = fields[3] + (fields[4] if len(fields) > 4 else 0)
+        ## guest and guest_nice are already counted in user and nice
+        total = sum(fields[:8])
+        return total - idle, total
+
+    def sample(self):
+        ''' Take a new reading of host and process CPU usage '''
+        now = time.monotonic()
+        process_time = time.process_time()
+        cpu_times = self.read_cpu_times()
+
+        busy_delta = cpu_times[0] - self.last_cpu_times[0]
+        total_delta = cpu_times[1] - self.last_cpu_times[1]
+        wall_delta = now - self.last_sample_time
+
+        self.load = self.read_load() / self.cpu_count
+        self.cpu_percent = round((busy_delta * 100) / total_delta, 1) if total_delta > 0 else 0.0
+        self.process_cpu_percent = (
+            round(((process_time - self.last_process_time) * 100) / wall_delta, 1)
+            if wall_delta > 0 else 0.0
+        )
+
+        self.last_cpu_times = cpu_times
+        self.last_process_time = process_time
+        self.last_sample_time = now
+
+    def overloaded_by(self, ratio=1.0):
+        ''' Return names of readings above their limit scaled by ratio '''
+        readings = [
+            ('load', self.load, self.settings['max_load']),
+            ('cpu', self.cpu_percent, self.settings['max_cpu_percent']),
+            ('process_cpu', self.process_cpu_percent, self.settings['max_process_cpu_percent']),
+        ]
+        return [name for name, value, limit in readings if value > limit * ratio]
+
+    def update(self):
+        ''' Sample host load and move one level up or down if needed '''
+        if not self.enabled:
+            self.write_metrics()
+            return self.level
+        if time.monotonic() - self.last_sample_time < MIN_SAMPLE_INTERVAL:
+            ## Keep previous readings and level until a usable window has passed
+            self.write_metrics()
+            return self.level
+        try:
+            self.sample()
+        except (OSError, ValueError, IndexError) as err:
+            print(f'Governor: unable to read host load, disabling ({err})')
+            self.enabled = False
+            self.set_level(0, 'governor disabled')
+            self.write_metrics()
+            return self.level
+
+        overloaded = self.overloaded_by()
+        if overloaded:
+            self.calm_samples = 0
+            if self.level < len(LEVELS) - 1:
+                self.set_level(self.level + 1, f"high {', '.join(overloaded)}")
+        elif not self.overloaded_by(self.settings['restore_ratio']):
+            self.calm_samples += 1
+            if self.level > 0 and self.calm_samples >= self.settings['restore_samples']:
+                self.calm_samples = 0
+                self.set_level(self.level - 1, 'load dropped')
+        else:
+            self.calm_samples = 0
+
+        self.write_metrics()
+        return self.level
+
+    def set_level(self, level, reason):
+        ''' Change governor level and log the decision '''
+        if level == self.level:
+            return
+        print(
+            f'Governor: {LEVELS[self.level]} -> {LEVELS[level]} ({reason}; '
+            f'load {self.load:.2f}, cpu {self.cpu_percent}%, process cpu {self.process_cpu_percent}%)'
+        )
+        self.level = level
+        self.level_changes += 1
+        self.last_change = time.time()
+        self.last_reason = reason
+
+    def frame_delay(self, speed):
+        ''' Scale effect frame delay for the current level '''
+        if self.level == 0:
+            return speed
+        return speed * (self.settings['frame_slowdown'] ** self.level)
+
+    def effect(self, effect):
+        ''' Return effect to run for the current level '''
+        if LEVELS[self.level] == 'static':
+            return STATIC_EFFECTS.get(effect, 'solid')
+        if LEVELS[self.level] == 'simple':
+            return SIMPLE_EFFECTS.get(effect, effect)
+        return effect
+
+    def metrics(self):
+        ''' Return current governor readings and decisions '''
+        return {
+            'enabled': self.enabled,
+            'level': self.level,
+            'level_name': LEVELS[self.level],
+            'load': round(self.load, 2),
+            'cpu_percent': self.cpu_percent,
+            'process_cpu_percent': self.process_cpu_percent,
+            'level_changes': self.level_changes,
+            'last_change': self.last_change,
+            'last_reason': self.last_reason,
+        }
+
+    def write_metrics(self):
+        ''' Write metrics to JSON file, if one is set '''
+        metrics_file = self.settings['metrics_file']
+        if not metrics_file:
+            return
+        try:
+            with open(f'{metrics_file}.tmp', 'w') as tmp_file:
+                json.dump(self.metrics(), tmp_file)
+            os.replace(f'{metrics_file}.tmp', metrics_file)
+        except OSError as err:
+            print(f'Governor: unable to write metrics file ({err})')
@@ -11,6 +11,7 @@ import threading
 from rpi_ws281x import Adafruit_NeoPixel
 import moonraker_api
 import effects
+import governor
 import utils
 
 def get_settings():
@@ -57,7 +58,8 @@ def run():
     strip = set_strip(strip_settings)
     strip.begin()
 
-    effects_cl = effects.Effects(strip, strip_settings, effects_settings)
+    load_governor = governor.LoadGovernor(settings.get('governor_settings'))
+    effects_cl = effects.Effects(strip, strip_settings, effects_settings, load_governor)
     bed_progress = effects.Progress(strip, strip_settings, effects_settings['bed_heating'])
     hotend_progress = effects.Progress(strip, strip_settings, effects_settings['hotend_heating'])
     printing_progress = effects.Progress(strip, strip_settings, effects_settings['printing'])
@@ -68,6 +70,7 @@ def run():
     test_counter = 0
     try:
         while True:
+            load_governor.update()
             printer_state = moonraker_api_cl.printer_state()
             # print(printer_state)
             if printer_state == 'printing':